@@ -38,8 +38,8 @@ export const handler: Schema["revokeTokenLambda"]["functionHandler"] = async (ev
       const parts = token.split('.');
       if (parts.length === 3) {
         const payloadB64 = parts[1];
-        const pad = '='.repeat((4 - (payloadB64.length % 4)) % 4);
-        const json = Buffer.from(payloadB64 + pad, 'base64url').toString('utf-8');
+        // Node's base64url decoder accepts unpadded input, so no '=' padding is appended
+        const json = Buffer.from(payloadB64, 'base64url').toString('utf-8');
         const payload = JSON.parse(json);
         // Set TTL to token expiration time (Unix timestamp in seconds)
         // Add 1 hour buffer to ensure it stays in blacklist until token expires
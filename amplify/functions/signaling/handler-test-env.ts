@@ -11,3 +11,5 @@ process.env.USER_INVALIDATION_TABLE = 'LocalUserInvalidation';
 process.env.WS_MGMT_ENDPOINT = 'https://example.com/_aws/ws';
 process.env.USER_POOL_ID = 'us-east-1_TestPool123';
 process.env.AWS_REGION = 'us-east-1';
+// Tests script presence reads per case with mockResolvedValueOnce; a warm cache would skip them
+process.env.PRESENCE_CACHE_TTL_MS = '0';
@@ -5,7 +5,7 @@
 // amplify/functions/signaling/handler.test.ts
 // Must run before handler load so getRobotByRobotId sees ROBOT_TABLE_NAME (handler reads env at load time)
 import './handler-test-env';
-import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
 import type {
   APIGatewayProxyEvent,
   APIGatewayEventRequestContext,
@@ -35,17 +35,6 @@ const { ddbSend, apigwSend } = vi.hoisted(() => {
   };
 });
 
-// ---------- Mock env before importing the module ----------
-process.env.CONN_TABLE = 'LocalConnections';
-process.env.ROBOT_PRESENCE_TABLE = 'LocalPresence';
-process.env.ROBOT_TABLE_NAME = 'LocalRobots';
-process.env.PARTNER_TABLE_NAME = 'LocalPartners';
-process.env.REVOKED_TOKENS_TABLE = 'LocalRevokedTokens';
-process.env.USER_INVALIDATION_TABLE = 'LocalUserInvalidation';
-process.env.WS_MGMT_ENDPOINT = 'https://example.com/_aws/ws';
-process.env.USER_POOL_ID = 'us-east-1_TestPool123';
-process.env.AWS_REGION = 'us-east-1';
-
 // ---------- Mock AWS SDK v3 clients ----------
 vi.mock('@aws-sdk/client-dynamodb', async () => {
   const actual = await vi.importActual<Record<string, unknown>>('@aws-sdk/client-dynamodb');
@@ -55,19 +44,6 @@ vi.mock('@aws-sdk/client-dynamodb', async () => {
   return { ...actual, DynamoDBClient: MockDynamoDBClient };
 });
 
-// Mock DynamoDBDocumentClient
-vi.mock('@aws-sdk/lib-dynamodb', async () => {
-  const actual = await vi.importActual<Record<string, unknown>>('@aws-sdk/lib-dynamodb');
-  return {
-    ...actual,
-    DynamoDBDocumentClient: {
-      from: vi.fn(() => ({
-        send: ddbSend, // Reuse the same mock for document client
-      })),
-    },
-  };
-});
-
 vi.mock('@aws-sdk/client-apigatewaymanagementapi', async () => {
   const actual = await vi.importActual<Record<string, unknown>>('@aws-sdk/client-apigatewaymanagementapi');
   class MockApiGwMgmtClient {
@@ -101,6 +77,8 @@ import {
   isSupportedProtocolVersion,
   normalizeNewProtocol,
   formatOutboundForConnection,
+  resetPresenceCache,
+  resetVerifiedTokenCache,
 } from './handler';
 import {
   PutItemCommand,
@@ -110,7 +88,6 @@ import {
   UpdateItemCommand,
 } from '@aws-sdk/client-dynamodb';
 import { PostToConnectionCommand } from '@aws-sdk/client-apigatewaymanagementapi';
-import { GetCommand } from '@aws-sdk/lib-dynamodb';
 
 // ---------- Helpers ----------
 function mkToken(payload: Record<string, unknown>) {
@@ -120,74 +97,49 @@ function mkToken(payload: Record<string, unknown>) {
   return `${header}.${body}.sig`;
 }
 
+/**
+ * Default jwtVerify: accepts any three-part token and returns its (unsigned) payload in jose format.
+ * Defined once at module level; beforeEach only re-installs it after mockReset.
+ */
+async function verifyTokenFromPayload(token: string) {
+  // Extract payload from token (same logic as old decodeJwtNoVerify for tests)
+  const parts = token.split('.');
+  if (parts.length !== 3) throw new Error('Invalid token');
+  // Node's base64url decoder accepts unpadded input, so no '=' padding is appended
+  const payload = JSON.parse(Buffer.from(parts[1], 'base64url').toString('utf-8'));
+
+  return {
+    payload: {
+      sub: payload.sub,
+      'cognito:groups': payload['cognito:groups'] || [],
+      aud: payload.aud,
+      exp: payload.exp || Math.floor(Date.now() / 1000) + 3600, // Default 1 hour from now
+    },
+    protectedHeader: { alg: 'RS256' },
+  };
+}
+
+/**
+ * Default DynamoDB send: every lookup misses. Revocation and invalidation GetItems return no Item
+ * (token allowed), the connection-table GetItem returns no Item (falls back to JWT), Queries return
+ * no Items, and writes succeed. Tests override specific calls with mockResolvedValueOnce or wrap
+ * this via ddbSend.getMockImplementation().
+ */
+async function defaultDdbSend(command: unknown) {
+  if (command instanceof QueryCommand) {
+    return { Items: [] };
+  }
+  return {};
+}
+
 beforeEach(() => {
+  resetPresenceCache();
+  resetVerifiedTokenCache();
   ddbSend.mockReset();
   apigwSend.mockReset();
   jwtVerifyMock.mockReset();
-  
-  // Default mock: verify token and return payload based on token content
-  jwtVerifyMock.mockImplementation(async (token: string) => {
-    // Extract payload from token (same logic as old decodeJwtNoVerify for tests)
-    const parts = token.split('.');
-    if (parts.length !== 3) throw new Error('Invalid token');
-    const payloadB64 = parts[1];
-    const pad = '='.repeat((4 - (payloadB64.length % 4)) % 4);
-    const json = Buffer.from(payloadB64 + pad, 'base64url').toString('utf-8');
-    const payload = JSON.parse(json);
-    
-    // Return in jose format
-    return {
-      payload: {
-        sub: payload.sub,
-        'cognito:groups': payload['cognito:groups'] || [],
-        aud: payload.aud,
-        exp: payload.exp || Math.floor(Date.now() / 1000) + 3600, // Default 1 hour from now
-      },
-      protectedHeader: { alg: 'RS256' },
-    };
-  });
-  
-  // Default mock: handle blacklist checks automatically (always allow, not revoked)
-  // Tests can use mockResolvedValueOnce to override specific calls
-  ddbSend.mockImplementation(async (command: unknown) => {
-    // Check if this is a blacklist check by inspecting the command
-    if (command instanceof GetItemCommand) {
-      const cmd = command as CommandWithInput;
-      const tableName = cmd.input?.TableName ?? cmd.TableName;
-      
-      if (tableName === 'LocalRevokedTokens' || tableName === process.env.REVOKED_TOKENS_TABLE) {
-        // This is a blacklist check - return empty (not revoked)
-        // This handles ALL blacklist checks, including fallback JWT verification
-        return Promise.resolve({}); // No Item = not revoked
-      }
-      
-      if (tableName === 'LocalUserInvalidation' || tableName === process.env.USER_INVALIDATION_TABLE) {
-        // User invalidation check - return empty (not invalidated)
-        // This is checked during JWT verification fallback
-        return Promise.resolve({}); // No Item = not invalidated
-      }
-      
-      if (tableName === 'LocalConnections' || tableName === process.env.CONN_TABLE) {
-        // Connection lookup - return empty by default (tests should override if needed)
-        // This allows connection table lookup to fail and fall back to JWT verification
-        return Promise.resolve({});
-      }
-    }
-    
-    // For QueryCommand (ACL checks, session locks, etc.), return empty by default
-    if (command instanceof QueryCommand) {
-      return Promise.resolve({ Items: [] });
-    }
-    
-    // For UpdateItemCommand (protocol persistence in Stage 1), return empty
-    // This prevents UpdateItem from consuming mockResolvedValueOnce meant for GetItem
-    if (command instanceof UpdateItemCommand) {
-      return Promise.resolve({});
-    }
-    
-    // For all other commands, return empty
-    return Promise.resolve({});
-  });
+  jwtVerifyMock.mockImplementation(verifyTokenFromPayload);
+  ddbSend.mockImplementation(defaultDdbSend);
 });
 
 // ===================================================================
@@ -763,6 +715,48 @@ describe('$connect', () => {
     expect(ddbSend).toHaveBeenCalled();
     const putCall = ddbSend.mock.calls.find(call => call[0] instanceof PutItemCommand);
     expect(putCall).toBeDefined();
+    // Groups are stored as a String Set; empty email is not written
+    const item = (putCall![0] as PutItemCommand).input.Item!;
+    expect(item.groups).toEqual({ SS: ['ADMINS'] });
+    expect(item.email).toBeUndefined();
+    expect((putCall![0] as PutItemCommand).input.ConditionExpression).toBe('attribute_not_exists(connectionId)');
+  });
+
+  it('accepts a replayed connect without rewriting the existing row', async () => {
+    const fallback = ddbSend.getMockImplementation()!;
+    ddbSend.mockImplementation(async (command: unknown) => {
+      if (command instanceof PutItemCommand) {
+        throw Object.assign(new Error('conditional'), { name: 'ConditionalCheckFailedException' });
+      }
+      return fallback(command);
+    });
+
+    const resp = await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$connect', 'C-replay'),
+      queryStringParameters: { token: mkToken({ sub: 'u-replay' }) },
+    }));
+
+    expect(resp.statusCode).toBe(200);
+    expect(ddbSend.mock.calls.filter((c) => c[0] instanceof PutItemCommand)).toHaveLength(1);
+  });
+});
+
+describe('token verification cache', () => {
+  it('verifies a repeated token once but checks revocation every time', async () => {
+    const token = mkToken({ sub: 'user-1' });
+    for (const connectionId of ['C-cache-1', 'C-cache-2']) {
+      const resp = await handler(asHandlerEvent({
+        requestContext: makeRequestContext('$connect', connectionId),
+        queryStringParameters: { token },
+      }));
+      expect(resp.statusCode).toBe(200);
+    }
+
+    expect(jwtVerifyMock).toHaveBeenCalledTimes(1);
+    const revocationChecks = ddbSend.mock.calls.filter(
+      (c) => c[0] instanceof GetItemCommand && (c[0] as CommandWithInput).input?.TableName === 'LocalRevokedTokens',
+    );
+    expect(revocationChecks).toHaveLength(2);
   });
 });
 
@@ -785,6 +779,42 @@ describe('register', () => {
     const putCall = ddbSend.mock.calls.find(call => call[0] instanceof PutItemCommand);
     expect(putCall).toBeDefined();
   });
+
+  it('admin force-claims presence with a single unconditional put', async () => {
+    const token = mkToken({ sub: 'admin-reg', 'cognito:groups': ['ADMINS'] });
+    const resp = await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$default', 'R-admin'),
+      queryStringParameters: { token },
+      body: JSON.stringify({ type: 'register', robotId: 'robot-claimed' }),
+    }));
+
+    expect(resp.statusCode).toBe(200);
+    const puts = ddbSend.mock.calls.filter((c) => c[0] instanceof PutItemCommand);
+    expect(puts).toHaveLength(1);
+    expect((puts[0][0] as PutItemCommand).input.ConditionExpression).toBeUndefined();
+  });
+
+  it('409 when a non-admin registers a robot owned by someone else', async () => {
+    const fallback = ddbSend.getMockImplementation()!;
+    ddbSend.mockImplementation(async (command: unknown) => {
+      if (command instanceof PutItemCommand) {
+        throw Object.assign(new Error('conditional'), { name: 'ConditionalCheckFailedException' });
+      }
+      return fallback(command);
+    });
+
+    const token = mkToken({ sub: 'not-owner' });
+    const resp = await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$default', 'R-other'),
+      queryStringParameters: { token },
+      body: JSON.stringify({ type: 'register', robotId: 'robot-claimed' }),
+    }));
+
+    expect(resp.statusCode).toBe(409);
+    const puts = ddbSend.mock.calls.filter((c) => c[0] instanceof PutItemCommand);
+    expect(puts).toHaveLength(1);
+    expect((puts[0][0] as PutItemCommand).input.ConditionExpression).toContain('ownerUserId = :me');
+  });
 });
 
 describe('offer forwarding', () => {
@@ -827,6 +857,234 @@ describe('offer forwarding', () => {
   });
 });
 
+describe('robot presence cache', () => {
+  const TTL_MS = 2_000;
+  let now: number;
+  let presenceRow: Record<string, unknown> | undefined;
+  let dateSpy: { mockRestore: () => void };
+
+  const presenceReads = () => ddbSend.mock.calls.filter(
+    (c) => c[0] instanceof GetItemCommand && (c[0] as CommandWithInput).input?.TableName === 'LocalPresence',
+  ).length;
+  // Posts to robot connections only (ignores any session notices sent back to the client)
+  const postedTo = () => apigwSend.mock.calls
+    .map((c) => (c[0] as PostToConnectionCommand).input.ConnectionId)
+    .filter((id) => id !== 'C-cache');
+  const sendOffer = () => handler(asHandlerEvent({
+    requestContext: makeRequestContext('$default', 'C-cache'),
+    queryStringParameters: { token: mkToken({ sub: 'owner-cache' }) },
+    body: JSON.stringify({ type: 'offer', robotId: 'robot-cache', payload: { sdp: 'v=0...' } }),
+  }));
+
+  beforeEach(() => {
+    resetPresenceCache(TTL_MS);
+    now = Date.now();
+    dateSpy = vi.spyOn(Date, 'now').mockImplementation(() => now);
+    presenceRow = { connectionId: { S: 'R-cache' }, ownerUserId: { S: 'owner-cache' } };
+    const fallback = ddbSend.getMockImplementation()!;
+    ddbSend.mockImplementation(async (command: unknown) => {
+      if (command instanceof GetItemCommand && (command as CommandWithInput).input?.TableName === 'LocalPresence') {
+        return presenceRow ? { Item: presenceRow } : {};
+      }
+      // The robot's new connection row carries its robotId (stored at register)
+      if (
+        command instanceof GetItemCommand &&
+        command.input.TableName === 'LocalConnections' &&
+        command.input.ProjectionExpression === 'robotId' &&
+        command.input.Key?.connectionId?.S === 'R-new'
+      ) {
+        return { Item: { robotId: { S: 'robot-cache' } } };
+      }
+      return fallback(command);
+    });
+    apigwSend.mockResolvedValue({});
+  });
+
+  /** Robot answer from its new connection R-new while this container still caches R-cache. */
+  const sendRobotAnswer = (body: Record<string, unknown>) => handler(asHandlerEvent({
+    requestContext: makeRequestContext('$default', 'R-new'),
+    queryStringParameters: { token: mkToken({ sub: 'owner-cache' }) },
+    body: JSON.stringify({ type: 'answer', to: 'C-cache', sdp: 'v=0...', ...body }),
+  }));
+  const allPostedTo = () => apigwSend.mock.calls.map((c) => (c[0] as PostToConnectionCommand).input.ConnectionId);
+
+  afterEach(() => {
+    dateSpy.mockRestore();
+    resetPresenceCache();
+  });
+
+  it('serves a second offer within the TTL without a presence GetItem', async () => {
+    expect((await sendOffer()).statusCode).toBe(200);
+    now += TTL_MS - 1;
+    expect((await sendOffer()).statusCode).toBe(200);
+
+    expect(presenceReads()).toBe(1);
+    expect(postedTo()).toEqual(['R-cache', 'R-cache']);
+  });
+
+  it('reads presence again once the entry expires', async () => {
+    await sendOffer();
+    now += TTL_MS + 1;
+    await sendOffer();
+
+    expect(presenceReads()).toBe(2);
+  });
+
+  it('reads presence again after the cached robot connection disconnects', async () => {
+    await sendOffer();
+    await handler(asHandlerEvent({ requestContext: makeRequestContext('$disconnect', 'R-cache') }));
+    await sendOffer();
+
+    expect(presenceReads()).toBe(2);
+  });
+
+  it('reads presence again after the robot re-registers', async () => {
+    await sendOffer();
+    await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$default', 'R-cache-2'),
+      queryStringParameters: { token: mkToken({ sub: 'owner-cache' }) },
+      body: JSON.stringify({ type: 'register', robotId: 'robot-cache' }),
+    }));
+    await sendOffer();
+
+    expect(presenceReads()).toBe(2);
+  });
+
+  it('re-reads presence and retries once when the cached robot connection is gone', async () => {
+    await sendOffer();
+    // The robot reconnected through another container; this container still caches R-cache
+    presenceRow = { connectionId: { S: 'R-new' }, ownerUserId: { S: 'owner-cache' } };
+    apigwSend.mockRejectedValueOnce(Object.assign(new Error('gone'), { name: 'GoneException' }));
+
+    const resp = await sendOffer();
+
+    expect(resp.statusCode).toBe(200);
+    expect(presenceReads()).toBe(2);
+    expect(postedTo()).toEqual(['R-cache', 'R-cache', 'R-new']);
+  });
+
+  it('re-reads a stale row before classifying a known robot connection as client traffic', async () => {
+    await sendOffer();
+    presenceRow = { connectionId: { S: 'R-new' }, ownerUserId: { S: 'owner-cache' } };
+
+    // robotId omitted: resolved from R-new's connection row, so the sender is known to be the robot
+    const resp = await sendRobotAnswer({});
+
+    expect(resp.statusCode).toBe(200);
+    expect(presenceReads()).toBe(2);
+    expect(allPostedTo().filter((id) => id !== 'C-cache')).toEqual(['R-cache']); // only the original offer
+    expect(allPostedTo()).toContain('C-cache');
+  });
+
+  it('routes a robot frame to the client when the gone retry lands on the sender itself', async () => {
+    await sendOffer();
+    presenceRow = { connectionId: { S: 'R-new' }, ownerUserId: { S: 'owner-cache' } };
+    apigwSend.mockImplementation(async (command: PostToConnectionCommand) => {
+      if (command.input.ConnectionId === 'R-cache') {
+        throw Object.assign(new Error('gone'), { name: 'GoneException' });
+      }
+      return {};
+    });
+    apigwSend.mockClear();
+
+    // robotId included, so the sender is not known to be the robot until the stale post fails
+    const resp = await sendRobotAnswer({ robotId: 'robot-cache' });
+
+    expect(resp.statusCode).toBe(200);
+    expect(allPostedTo()).toEqual(['R-cache', 'C-cache']);
+  });
+
+  it('does not cache a pending (PKI not yet verified) presence row', async () => {
+    presenceRow = { connectionId: { S: 'R-cache' }, ownerUserId: { S: 'owner-cache' }, status: { S: 'pending' } };
+    expect((await sendOffer()).statusCode).toBe(404);
+
+    // The robot verifies through another container
+    presenceRow = { connectionId: { S: 'R-cache' }, ownerUserId: { S: 'owner-cache' }, status: { S: 'online' } };
+    expect((await sendOffer()).statusCode).toBe(200);
+
+    expect(presenceReads()).toBe(2);
+    expect(postedTo()).toEqual(['R-cache']);
+  });
+
+  it('never caches a missing presence row', async () => {
+    presenceRow = undefined;
+    expect((await sendOffer()).statusCode).toBe(404);
+    const readsPerOffer = presenceReads();
+    expect((await sendOffer()).statusCode).toBe(404);
+
+    expect(readsPerOffer).toBeGreaterThan(0);
+    expect(presenceReads()).toBe(readsPerOffer * 2);
+    expect(postedTo()).toEqual([]);
+  });
+});
+
+describe('monitor fan-out', () => {
+  it('copies a forwarded offer to every monitoring connection', async () => {
+    const fallback = ddbSend.getMockImplementation()!;
+    ddbSend.mockImplementation(async (command: unknown) => {
+      const input = (command as { input?: { TableName?: string; IndexName?: string } }).input;
+      if (command instanceof QueryCommand && input?.IndexName === 'monitoringRobotIdIndex') {
+        return { Items: [{ connectionId: { S: 'M-1' } }, { connectionId: { S: 'M-2' } }] };
+      }
+      if (command instanceof GetItemCommand && input?.TableName === 'LocalPresence') {
+        return { Item: { connectionId: { S: 'R-mon' }, ownerUserId: { S: 'owner-m' } } };
+      }
+      return fallback(command);
+    });
+    apigwSend.mockResolvedValue({});
+
+    const token = mkToken({ sub: 'owner-m' });
+    const resp = await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$default', 'C-mon'),
+      queryStringParameters: { token },
+      body: JSON.stringify({ type: 'offer', robotId: 'robot-mon', payload: { sdp: 'v=0...' } }),
+    }));
+
+    expect(resp.statusCode).toBe(200);
+    const targets = apigwSend.mock.calls.map((c) => (c[0] as PostToConnectionCommand).input.ConnectionId);
+    expect(targets).toEqual(expect.arrayContaining(['R-mon', 'M-1', 'M-2']));
+    expect(targets).toHaveLength(3);
+  });
+
+  it('logs a failed monitor post with its robotId and skips gone monitors', async () => {
+    const fallback = ddbSend.getMockImplementation()!;
+    ddbSend.mockImplementation(async (command: unknown) => {
+      const input = (command as { input?: { TableName?: string; IndexName?: string } }).input;
+      if (command instanceof QueryCommand && input?.IndexName === 'monitoringRobotIdIndex') {
+        return { Items: [{ connectionId: { S: 'M-fail' } }, { connectionId: { S: 'M-gone' } }] };
+      }
+      if (command instanceof GetItemCommand && input?.TableName === 'LocalPresence') {
+        return { Item: { connectionId: { S: 'R-monerr' }, ownerUserId: { S: 'owner-m' } } };
+      }
+      return fallback(command);
+    });
+    apigwSend.mockImplementation(async (command: PostToConnectionCommand) => {
+      if (command.input.ConnectionId === 'M-fail') throw new Error('throttled');
+      if (command.input.ConnectionId === 'M-gone') {
+        throw Object.assign(new Error('gone'), { name: 'GoneException' });
+      }
+      return {};
+    });
+    const warn = vi.spyOn(console, 'warn').mockImplementation(() => {});
+
+    try {
+      const resp = await handler(asHandlerEvent({
+        requestContext: makeRequestContext('$default', 'C-monerr'),
+        queryStringParameters: { token: mkToken({ sub: 'owner-m' }) },
+        body: JSON.stringify({ type: 'offer', robotId: 'robot-monerr', payload: { sdp: 'v=0...' } }),
+      }));
+
+      expect(resp.statusCode).toBe(200);
+      const monitorErrors = warn.mock.calls.filter((c) => c[0] === '[MONITOR_NOTIFY_ERROR]');
+      expect(monitorErrors).toEqual([
+        ['[MONITOR_NOTIFY_ERROR]', { connectionId: 'M-fail', robotId: 'robot-monerr', error: 'throttled' }],
+      ]);
+    } finally {
+      warn.mockRestore();
+    }
+  });
+});
+
 describe('$disconnect', () => {
   it('deletes connection row', async () => {
     const resp = await handler(asHandlerEvent({
@@ -836,6 +1094,26 @@ describe('$disconnect', () => {
     const deleteCall = ddbSend.mock.calls.find((c) => c[0] instanceof DeleteItemCommand);
     expect(deleteCall).toBeDefined();
   });
+
+  it('removes each robot presence row found for the connection', async () => {
+    // Presence scan (first call in $disconnect) finds two robots on this connection
+    ddbSend.mockResolvedValueOnce({
+      Items: [
+        { robotId: { S: 'robot-d1' }, connectionId: { S: 'R-D' } },
+        { robotId: { S: 'robot-d2' }, connectionId: { S: 'R-D' } },
+      ],
+    });
+
+    const resp = await handler(asHandlerEvent({
+      requestContext: makeRequestContext('$disconnect', 'R-D'),
+    }));
+
+    expect(resp.statusCode).toBe(200);
+    const presenceDeletes = ddbSend.mock.calls
+      .map((c) => c[0])
+      .filter((cmd): cmd is DeleteItemCommand => cmd instanceof DeleteItemCommand && cmd.input.TableName === 'LocalPresence');
+    expect(presenceDeletes.map((cmd) => cmd.input.Key?.robotId?.S)).toEqual(['robot-d1', 'robot-d2']);
+  });
 });
 
 // ===================================================================
@@ -943,7 +1221,7 @@ describe('auth & validation errors', () => {
         partnerId: { S: 'partner-1' },
       }],
     });
-    ddbSend.mockResolvedValueOnce({ Item: { owner: 'owner-1' } });
+    ddbSend.mockResolvedValueOnce({ Item: { owner: { S: 'owner-1' } } });
     apigwSend.mockResolvedValue({});
 
     const resp = await handler(asHandlerEvent({
@@ -981,7 +1259,7 @@ describe('auth & validation errors', () => {
         partnerId: { S: 'partner-1' },
       }],
     });
-    ddbSend.mockResolvedValueOnce({ Item: { owner: 'owner-1' } });
+    ddbSend.mockResolvedValueOnce({ Item: { owner: { S: 'owner-1' } } });
     apigwSend.mockResolvedValue({});
 
     const resp = await handler(asHandlerEvent({
@@ -1034,10 +1312,10 @@ describe('auth & validation errors', () => {
           });
         }
       }
-      if (cmd instanceof GetCommand) {
+      if (cmd instanceof GetItemCommand) {
         const table = (cmd as { input?: { TableName?: string } }).input?.TableName;
         if (table === 'LocalPartners' || table === process.env.PARTNER_TABLE_NAME) {
-          return Promise.resolve({ Item: { owner: 'owner-1' } });
+          return Promise.resolve({ Item: { owner: { S: 'owner-1' } } });
         }
       }
       return Promise.resolve({});
@@ -1101,10 +1379,10 @@ describe('auth & validation errors', () => {
           });
         }
       }
-      if (cmd instanceof GetCommand) {
+      if (cmd instanceof GetItemCommand) {
         const table = (cmd as { input?: { TableName?: string } }).input?.TableName;
         if (table === 'LocalPartners' || table === process.env.PARTNER_TABLE_NAME) {
-          return Promise.resolve({ Item: { owner: 'owner-1' } });
+          return Promise.resolve({ Item: { owner: { S: 'owner-1' } } });
         }
       }
       return Promise.resolve({});
@@ -1149,7 +1427,7 @@ describe('auth & validation errors', () => {
     ddbSend.mockResolvedValueOnce({
       Items: [{ robotId: { S: 'robot-pki' }, publicKey: { S: publicKeyPem }, partnerId: { S: 'p1' } }],
     });
-    ddbSend.mockResolvedValueOnce({ Item: { owner: 'owner-1' } });
+    ddbSend.mockResolvedValueOnce({ Item: { owner: { S: 'owner-1' } } });
     ddbSend.mockResolvedValueOnce({
       Item: {
         pkiChallenge: { S: challengeBase64 },
@@ -1344,6 +1622,11 @@ describe('takeover', () => {
 
     expect(resp.statusCode).toBe(403);
     expect(apigwSend).not.toHaveBeenCalled();
+    // Presence row is read once and reused for the owner check
+    const presenceReads = ddbSend.mock.calls.filter(
+      (c) => c[0] instanceof GetItemCommand && (c[0] as CommandWithInput).input?.TableName === 'LocalPresence',
+    );
+    expect(presenceReads).toHaveLength(1);
   });
 
   it('admin can takeover and message robot', async () => {
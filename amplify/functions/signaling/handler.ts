@@ -11,11 +11,11 @@ import {
     ConditionalCheckFailedException,
     type AttributeValue,
 } from '@aws-sdk/client-dynamodb';
-import { DynamoDBDocumentClient, QueryCommand as DocQueryCommand, GetCommand } from '@aws-sdk/lib-dynamodb';
 import { createHash, randomUUID, randomBytes, verify as cryptoVerify, createPublicKey } from 'crypto';
+import { Agent as HttpsAgent } from 'https';
 import { ApiGatewayManagementApiClient, PostToConnectionCommand, DeleteConnectionCommand } from '@aws-sdk/client-apigatewaymanagementapi';
 import { LambdaClient, InvokeCommand } from '@aws-sdk/client-lambda';
-import { jwtVerify, createRemoteJWKSet } from 'jose';
+import { jwtVerify, createRemoteJWKSet, type JWTPayload } from 'jose';
 import { SESSION_END_REASON } from "../shared/session-end-reasons";
 
 const CONN_TABLE = process.env.CONN_TABLE!;
@@ -42,18 +42,68 @@ const PKI_PENDING_TIMEOUT_MS = Number(process.env.PKI_PENDING_TIMEOUT_MS) || 120
 
 const PKI_CHALLENGE_NONCE_BYTES = 32;
 
+// Robot presence is cached in-container for this long (ms) so the burst of ICE candidates after an offer
+// skips the presence GetItem. Env override: PRESENCE_CACHE_TTL_MS (0 disables the cache).
+// Presence writes in other containers (reconnects, admin force-claims) are only seen after expiry, so
+// ownerUserId-based authorization can lag by up to the TTL; a forward that hits a gone cached
+// connection re-reads the row and retries (see handleSignal).
+const PRESENCE_CACHE_TTL_MS = process.env.PRESENCE_CACHE_TTL_MS !== undefined
+  ? Number(process.env.PRESENCE_CACHE_TTL_MS)
+  : 2_000;
+
 // Default platform markup (30%) if not set
 const DEFAULT_PLATFORM_MARKUP_PERCENT = 30;
 
-const db = new DynamoDBClient({});
-const docClient = DynamoDBDocumentClient.from(db); // For UserCredits and PlatformSettings queries
-const mgmt = new ApiGatewayManagementApiClient({ endpoint: WS_MGMT_ENDPOINT});
-const lambdaClient = new LambdaClient({});
+// Shared SDK client config: keep-alive sockets are reused across warm invocations so signaling
+// calls skip the TCP+TLS handshake; short timeouts and bounded adaptive retries keep a slow
+// dependency from stalling the WebSocket route.
+const AWS_CLIENT_CONFIG = {
+  maxAttempts: 3,
+  retryMode: 'adaptive',
+  requestHandler: {
+    connectionTimeout: 1_000,
+    requestTimeout: 2_000,
+    httpsAgent: new HttpsAgent({ keepAlive: true, maxSockets: 50 }),
+  },
+};
+
+const db = new DynamoDBClient(AWS_CLIENT_CONFIG);
+
+// Built on first use and then reused: $disconnect and JWT $connect never post to a connection,
+// and only session teardown invokes a Lambda, so cold starts on those paths skip this setup.
+let mgmtClient: ApiGatewayManagementApiClient | undefined;
+function getMgmt(): ApiGatewayManagementApiClient {
+  return (mgmtClient ??= new ApiGatewayManagementApiClient({ ...AWS_CLIENT_CONFIG, endpoint: WS_MGMT_ENDPOINT }));
+}
+
+let lambdaClient: LambdaClient | undefined;
+function getLambdaClient(): LambdaClient {
+  return (lambdaClient ??= new LambdaClient(AWS_CLIENT_CONFIG));
+}
 const SETTLE_SESSION_PAYMENT_FUNCTION_NAME = process.env.SETTLE_SESSION_PAYMENT_FUNCTION_NAME;
 
-// Cognito JWKS URL - public keys for verifying JWT signatures
-const JWKS_URL = `https://cognito-idp.${AWS_REGION}.amazonaws.com/${USER_POOL_ID}/.well-known/jwks.json`;
+// Cognito issuer and JWKS URL - public keys for verifying JWT signatures
+const COGNITO_ISSUER = `https://cognito-idp.${AWS_REGION}.amazonaws.com/${USER_POOL_ID}`;
+const JWKS_URL = `${COGNITO_ISSUER}/.well-known/jwks.json`;
 const JWKS = createRemoteJWKSet(new URL(JWKS_URL));
+// Built once; jwtVerify hands base64url decoding and RSA verification to Node's native crypto
+const JWT_VERIFY_OPTIONS = {
+    issuer: COGNITO_ISSUER,
+    // Cognito ID tokens use the client ID as audience
+    // We'll be lenient here since we don't know the exact client ID
+    // The signature verification is the most important part
+};
+
+// Signature-verified token payloads cached per warm container, keyed by the token's SHA-256 (the same
+// hash the revocation table uses). A WebRTC session presents the same token on every frame; hits skip
+// jwtVerify. Revocation and global sign-out are still checked per call, and entries expire with the token.
+const VERIFIED_TOKEN_CACHE_MAX = 1024;
+const verifiedTokenCache = new Map<string, VerifiedToken>();
+
+/** Empties verifiedTokenCache. Exported for tests, so jwtVerify mocks see every token regardless of test order. */
+export function resetVerifiedTokenCache(): void {
+    verifiedTokenCache.clear();
+}
 
 // ---------------------------------
 // TURN / ICE helpers
@@ -125,9 +175,12 @@ type Target = 'robot' | 'client';
 // 
 // ---------------------------------
 
+/** Shared groups value for the common no-group user, so claims without groups allocate no array. */
+const NO_GROUPS: readonly string[] = Object.freeze([]);
+
 type Claims = {
     sub?: string;
-    groups?: string[];
+    groups?: readonly string[];
     aud?: string;
     email?: string;
     'cognito:username'?: string;
@@ -135,6 +188,18 @@ type Claims = {
     pkiPending?: boolean;
 };
 
+/**
+ * The fields verifyCognitoJWT reads from a verified payload, extracted once per token.
+ * Cache hits reuse this fixed-shape record instead of re-reading the payload's open key set.
+ */
+type VerifiedToken = {
+    exp?: number;
+    iat?: number;
+    /** cognito:username, falling back to email then sub; keys the global sign-out check. */
+    userId?: string;
+    claims: Claims;
+};
+
 type InboundMessage = Partial<{
     type: MessageType;
     robotId: string;
@@ -345,10 +410,10 @@ async function postFormatted(
   connectionId: string,
   internalMsg: InternalOutboundMessage,
   formatOverride?: { protocol?: ConnectionProtocol; version?: string },
-): Promise<void> {
+): Promise<boolean> {
   const proto = formatOverride ?? (await getConnectionProtocol(connectionId));
   const formatted = formatOutboundForConnection(internalMsg, proto?.protocol, proto?.version);
-  await postTo(connectionId, formatted);
+  return postTo(connectionId, formatted);
 }
 
 // ---------------------------------
@@ -383,13 +448,17 @@ async function getUserInvalidationTimestamp(userId: string): Promise<number | nu
     }
 }
 
+/** SHA-256 hex digest of a token; key for both the revocation table and verifiedTokenCache. */
+function hashToken(token: string): string {
+    return createHash('sha256').update(token).digest('hex');
+}
+
 /**
  * Checks if a token is in the revocation blacklist.
  * Returns true if token is revoked, false otherwise.
  */
-async function isTokenRevoked(token: string): Promise<boolean> {
+async function isTokenRevoked(token: string, tokenHash: string = hashToken(token)): Promise<boolean> {
     try {
-        const tokenHash = createHash('sha256').update(token).digest('hex');
         const result = await db.send(
             new GetItemCommand({
                 TableName: REVOKED_TOKENS_TABLE,
@@ -406,6 +475,52 @@ async function isTokenRevoked(token: string): Promise<boolean> {
     }
 }
 
+/** Copies the claims the handler uses out of a verified payload into a VerifiedToken. */
+function toVerifiedToken(payload: JWTPayload): VerifiedToken {
+    const sub = payload.sub;
+    const email = payload.email as string | undefined;
+    const username = payload['cognito:username'] as string | undefined;
+    return {
+        exp: payload.exp,
+        iat: payload.iat,
+        userId: username || email || sub,
+        claims: {
+            sub,
+            groups: (payload['cognito:groups'] as string[] | undefined) ?? NO_GROUPS,
+            aud: payload.aud as string | undefined,
+            email,
+            'cognito:username': username,
+        },
+    };
+}
+
+/**
+ * Returns the verified token for a JWT, from verifiedTokenCache when a live entry exists.
+ * Throws (like jwtVerify) when the signature, issuer, or expiry is invalid.
+ */
+async function verifyTokenSignature(token: string, tokenHash: string): Promise<VerifiedToken> {
+    const nowSeconds = Math.floor(Date.now() / 1000);
+    const cached = verifiedTokenCache.get(tokenHash);
+    if (cached) {
+        verifiedTokenCache.delete(tokenHash);
+        if (cached.exp && cached.exp >= nowSeconds) {
+            verifiedTokenCache.set(tokenHash, cached); // Re-insert to keep Map order least-recently-used first
+            return cached;
+        }
+    }
+
+    const { payload } = await jwtVerify(token, JWKS, JWT_VERIFY_OPTIONS);
+    const verified = toVerifiedToken(payload);
+    if (verified.exp) {
+        if (verifiedTokenCache.size >= VERIFIED_TOKEN_CACHE_MAX) {
+            const oldest = verifiedTokenCache.keys().next().value;
+            if (oldest !== undefined) verifiedTokenCache.delete(oldest);
+        }
+        verifiedTokenCache.set(tokenHash, verified);
+    }
+    return verified;
+}
+
 /**
  * Verifies and decodes a Cognito JWT token.
  * Validates signature, expiration, issuer, and audience.
@@ -416,32 +531,26 @@ async function verifyCognitoJWT(token: string | null | undefined): Promise<Claim
     if (!token) return null;
     
     // First check if token is revoked (before expensive signature verification)
-    const revoked = await isTokenRevoked(token);
+    const tokenHash = hashToken(token);
+    const revoked = await isTokenRevoked(token, tokenHash);
     if (revoked) {
         console.warn('Token is revoked', { hasToken: !!token });
         return null;
     }
     
     try {
-        // Verify the JWT signature and decode the payload
-        const { payload } = await jwtVerify(token, JWKS, {
-            issuer: `https://cognito-idp.${AWS_REGION}.amazonaws.com/${USER_POOL_ID}`,
-            // Cognito ID tokens use the client ID as audience
-            // We'll be lenient here since we don't know the exact client ID
-            // The signature verification is the most important part
-        });
+        // Verify the JWT signature and decode the payload (cached per token within a warm container)
+        const verified = await verifyTokenSignature(token, tokenHash);
 
         // Check expiration (jwtVerify already does this, but we're explicit)
         const now = Math.floor(Date.now() / 1000);
-        if (payload.exp && payload.exp < now) {
-            console.warn('Token expired', { exp: payload.exp, now });
+        if (verified.exp && verified.exp < now) {
+            console.warn('Token expired', { exp: verified.exp, now });
             return null;
         }
 
-        // Extract userId from claims (need this to check invalidation)
-        const userId = (payload['cognito:username'] as string | undefined) || 
-                      (payload.email as string | undefined) || 
-                      (payload.sub as string | undefined);
+        // userId (cognito:username, email, or sub) is needed to check invalidation
+        const userId = verified.userId;
         
         // Check if user's session has been invalidated (global sign-out)
         // If token was issued (iat) before invalidation timestamp, reject it
@@ -450,7 +559,7 @@ async function verifyCognitoJWT(token: string | null | undefined): Promise<Claim
             if (invalidatedAt) {
                 // Token's iat is in seconds, invalidatedAt is in milliseconds
                 // Convert invalidatedAt to seconds for comparison
-                const tokenIat = payload.iat as number | undefined;
+                const tokenIat = verified.iat;
                 const invalidatedAtSeconds = Math.floor(invalidatedAt / 1000);
                 
                 if (tokenIat && tokenIat < invalidatedAtSeconds) {
@@ -465,14 +574,7 @@ async function verifyCognitoJWT(token: string | null | undefined): Promise<Claim
             }
         }
 
-        // Extract claims
-        return {
-            sub: payload.sub as string | undefined,
-            groups: (payload['cognito:groups'] as string[] | undefined) ?? [],
-            aud: payload.aud as string | undefined,
-            email: payload.email as string | undefined,
-            'cognito:username': payload['cognito:username'] as string | undefined,
-        };
+        return verified.claims;
     } catch (error) {
         // Log verification failures for security monitoring
         console.warn('JWT verification failed', {
@@ -483,6 +585,21 @@ async function verifyCognitoJWT(token: string | null | undefined): Promise<Claim
     }
 }
 
+/** Message types accepted verbatim from legacy (non-envelope) frames. */
+const LEGACY_MESSAGE_TYPES: ReadonlySet<string> = new Set([
+  'offer',
+  'answer',
+  'register',
+  'takeover',
+  'ice-candidate',
+  'monitor',
+  'ping',
+  'pong',
+  'signalling.ping',
+  'signalling.pong',
+  'signalling.capabilities',
+]);
+
 /**
  * Extracts and normalizes the message type from a raw message.
  * Maps legacy 'candidate' to 'ice-candidate' for backward compatibility.
@@ -494,23 +611,8 @@ function extractMessageType(raw: RawMessage): MessageType | undefined {
   const t = raw.type.toLowerCase();
   if (t === 'candidate') {
     return 'ice-candidate'; // map legacy name to internal name
-  } else if (
-    t === 'offer' ||
-    t === 'answer' ||
-    t === 'register' ||
-    t === 'takeover' ||
-    t === 'ice-candidate' ||
-    t === 'monitor' ||
-    t === 'ping' ||
-    t === 'pong' ||
-    t === 'signalling.ping' ||
-    t === 'signalling.pong' ||
-    t === 'signalling.capabilities'
-  ) {
-    return t as MessageType;
   }
-  
-  return undefined;
+  return LEGACY_MESSAGE_TYPES.has(t) ? (t as MessageType) : undefined;
 }
 
 /**
@@ -859,54 +961,138 @@ function successResponse(body: string | object = ''): APIGatewayProxyResult {
   };
 }
 
-// Send a JSON messgae to a specific Websocket connection via Management API
-async function postTo(connectionId: string, message: unknown): Promise<void> {
+// Send a JSON messgae to a specific Websocket connection via Management API. Throws on any failure;
+// when the socket is already closed (GoneException) it also stops routing cached robots to it.
+async function sendToConnection(connectionId: string, message: unknown): Promise<void> {
     try {
-        await mgmt.send(
+        await getMgmt().send(
             new PostToConnectionCommand({
                 ConnectionId: connectionId,
-                Data: Buffer.from(JSON.stringify(message), 'utf-8'),
+                Data: JSON.stringify(message), // SDK accepts a string blob; skips an extra Buffer copy
             }),
         );
     } catch (err: unknown) {
-        // Ignore when the socket is already closed
-        if ((err as { name?: string })?.name !== 'GoneException') {
-            console.warn('post_to_connection error', err)
+        if ((err as { name?: string })?.name === 'GoneException') {
+            forgetPresenceForConnection(connectionId);
+        }
+        throw err;
+    }
+}
+
+// Like sendToConnection, but never throws. Resolves false when the connection is gone (GoneException)
+// so callers routing from cached presence can retry; other failures are logged.
+async function postTo(connectionId: string, message: unknown): Promise<boolean> {
+    try {
+        await sendToConnection(connectionId, message);
+    } catch (err: unknown) {
+        if ((err as { name?: string })?.name === 'GoneException') {
+            return false;
         }
+        console.warn('post_to_connection error', err)
     }
+    return true;
+}
+
+/**
+ * Sends messages to several connections concurrently so N posts cost one round trip of wall-clock time
+ * (bounded by the management client's socket pool). Never rejects: resolves to one settled result per
+ * message, in input order, so callers can log failures with their own context.
+ */
+async function postToMany(
+    messages: Array<[connectionId: string, message: unknown]>,
+): Promise<PromiseSettledResult<void>[]> {
+    return Promise.allSettled(messages.map(([connectionId, message]) => sendToConnection(connectionId, message)));
 }
 
 /** DynamoDB Item shape for robot presence (subset we use when reusing a single read). */
 type RobotPresenceItem = { connectionId?: { S?: string }; ownerUserId?: { S?: string }; status?: { S?: string } } | undefined;
 
+/** Presence rows cached per warm container, keyed by robotId. Only found, non-pending rows are cached. */
+const presenceCache = new Map<string, { item: NonNullable<RobotPresenceItem>; expiresAt: number }>();
+let presenceCacheTtlMs = PRESENCE_CACHE_TTL_MS;
+
+/**
+ * Empties presenceCache and sets its TTL (defaults to PRESENCE_CACHE_TTL_MS). Exported for tests,
+ * which import the handler once per file and would otherwise share cached rows across cases.
+ */
+export function resetPresenceCache(ttlMs: number = PRESENCE_CACHE_TTL_MS): void {
+    presenceCache.clear();
+    presenceCacheTtlMs = ttlMs;
+}
+
+/**
+ * Reads the projected presence row for a robot (connectionId, ownerUserId, status).
+ * Callers fetch once per request and reuse the item for authorization and routing.
+ * Served from presenceCache for PRESENCE_CACHE_TTL_MS; writers invalidate via forgetRobotPresence.
+ * Writers in other containers are not seen until the entry expires, so `fresh` skips the cache
+ * (used to re-route after a post to a cached connection comes back gone).
+ */
+async function getRobotPresence(robotId: string, options: { fresh?: boolean } = {}): Promise<RobotPresenceItem> {
+    return (await lookupRobotPresence(robotId, options.fresh ?? false)).item;
+}
+
+/** getRobotPresence plus whether the row was served from presenceCache. */
+async function lookupRobotPresence(
+    robotId: string,
+    fresh: boolean,
+): Promise<{ item: RobotPresenceItem; fromCache: boolean }> {
+    const cached = fresh ? undefined : presenceCache.get(robotId);
+    if (cached && cached.expiresAt > Date.now()) {
+        return { item: cached.item, fromCache: true };
+    }
+    const res = await db.send(
+        new GetItemCommand({
+            TableName: ROBOT_PRESENCE_TABLE,
+            Key: { robotId: { S: robotId } },
+            ProjectionExpression: 'connectionId, ownerUserId, #status',
+            ExpressionAttributeNames: { '#status': 'status' },
+        }),
+    );
+    const item = res.Item as RobotPresenceItem;
+    // Pending rows (PKI not yet verified) are not cached: the robot may verify through another
+    // container, and a cached pending row would keep rejecting client traffic until it expired.
+    if (item && item.status?.S !== 'pending' && presenceCacheTtlMs > 0) {
+        presenceCache.set(robotId, { item, expiresAt: Date.now() + presenceCacheTtlMs });
+    } else {
+        presenceCache.delete(robotId);
+    }
+    return { item, fromCache: false };
+}
+
+/** Drops the cached presence row for a robot (after register, PKI upgrade, or removal). */
+function forgetRobotPresence(robotId: string): void {
+    presenceCache.delete(robotId);
+}
+
+/** Drops any cached presence rows that route to the given connection (disconnect or GoneException). */
+function forgetPresenceForConnection(connectionId: string): void {
+    for (const [robotId, entry] of presenceCache) {
+        if (entry.item.connectionId?.S === connectionId) {
+            presenceCache.delete(robotId);
+        }
+    }
+}
+
 // If caller is the robot owner, a delegated operator, or in an admin group return True
 // Optional presenceItem: when provided (from a prior GetItem in the same request), avoids an extra DB read.
 async function isOwnerOrAdmin(
     robotId: string,
-    claims: { sub?: string; groups?: string[] },
+    claims: { sub?: string; groups?: readonly string[] },
     presenceItem?: RobotPresenceItem,
 ): Promise<boolean> {
     let owner: string | undefined;
     if (presenceItem != null && ('ownerUserId' in presenceItem) && presenceItem.ownerUserId?.S) {
         owner = presenceItem.ownerUserId.S;
     } else {
-        const res = await db.send(
-            new GetItemCommand({
-                TableName: ROBOT_PRESENCE_TABLE,
-                Key: { robotId: { S: robotId } },
-            }),
-        );
-        owner = res.Item?.ownerUserId?.S;
+        owner = (await getRobotPresence(robotId))?.ownerUserId?.S;
     }
-    const isAdmin = (claims.groups ?? []).some((g) => g === 'ADMINS' || g === 'admin');
-    
     // Check if user is owner (ownerUserId may be Cognito sub or, for pending presence, cognitoUsername)
     if (!!owner && (owner === claims.sub || owner === (claims as Claims & { 'cognito:username'?: string })['cognito:username'])) {
         return true;
     }
     
     // Check if user is admin
-    if (isAdmin) {
+    if (isAdmin(claims.groups)) {
         return true;
     }
     
@@ -1057,10 +1243,12 @@ async function canAccessRobot(
     }
 }
 
-// Helper to determine if user is an admin
-function isAdmin(groups?: string[] | null): boolean {
-    const gs = new Set((groups ?? []).map(g => g.toUpperCase()));
-    return gs.has('ADMINS') || gs.has('ADMIN');
+/** Admin group names, upper-cased; built once instead of per check. */
+const ADMIN_GROUPS: ReadonlySet<string> = new Set(['ADMINS', 'ADMIN']);
+
+// Helper to determine if user is an admin (case-insensitive, stops at the first admin group)
+function isAdmin(groups?: readonly string[] | null): boolean {
+    return !!groups && groups.some((g) => ADMIN_GROUPS.has(g.toUpperCase()));
 }
 
 // Session Lock Check
@@ -1140,21 +1328,22 @@ async function checkUserBalance(
   }
 
   try {
-    // 1. Get user's current credit balance (using DocumentClient for UserCredits table)
+    // 1. Get user's current credit balance
     let currentCredits = 0;
     if (USER_CREDITS_TABLE) {
-      const userCreditsResult = await docClient.send(
-        new DocQueryCommand({
+      const userCreditsResult = await db.send(
+        new QueryCommand({
           TableName: USER_CREDITS_TABLE,
           IndexName: 'userIdIndex',
           KeyConditionExpression: 'userId = :userId',
           ExpressionAttributeValues: {
-            ':userId': userId,
+            ':userId': { S: userId },
           },
+          ProjectionExpression: 'credits',
           Limit: 1,
         })
       );
-      currentCredits = userCreditsResult.Items?.[0]?.credits || 0;
+      currentCredits = parseFloat(userCreditsResult.Items?.[0]?.credits?.N ?? '0') || 0;
     }
 
     // 2. Get robot's hourly rate (using low-level API for Robot table)
@@ -1186,23 +1375,25 @@ async function checkUserBalance(
       return { sufficient: true, currentCredits, requiredCredits: 0 };
     }
 
-    // 3. Get platform markup percentage (using DocumentClient for PlatformSettings table)
+    // 3. Get platform markup percentage
     let platformMarkupPercent = DEFAULT_PLATFORM_MARKUP_PERCENT;
     if (PLATFORM_SETTINGS_TABLE) {
       try {
-        const settingsResult = await docClient.send(
-          new DocQueryCommand({
+        const settingsResult = await db.send(
+          new QueryCommand({
             TableName: PLATFORM_SETTINGS_TABLE,
             IndexName: 'settingKeyIndex',
             KeyConditionExpression: 'settingKey = :key',
             ExpressionAttributeValues: {
-              ':key': 'platformMarkupPercent',
+              ':key': { S: 'platformMarkupPercent' },
             },
+            ProjectionExpression: 'settingValue',
             Limit: 1,
           })
         );
-        if (settingsResult.Items?.[0]?.settingValue) {
-          platformMarkupPercent = parseFloat(settingsResult.Items[0].settingValue) || DEFAULT_PLATFORM_MARKUP_PERCENT;
+        const settingValue = settingsResult.Items?.[0]?.settingValue?.S;
+        if (settingValue) {
+          platformMarkupPercent = parseFloat(settingValue) || DEFAULT_PLATFORM_MARKUP_PERCENT;
         }
       } catch (err) {
         console.warn('[BALANCE_CHECK] Failed to fetch platform markup, using default:', err);
@@ -1255,10 +1446,11 @@ function robotTrialOnePerCustomerFromItem(robotItem: Record<string, AttributeVal
 async function hasUserConsumedRobotTrial(userId: string, robotIdStr: string): Promise<boolean> {
   if (!USER_ROBOT_TRIAL_CONSUMPTION_TABLE_NAME) return false;
   try {
-    const res = await docClient.send(
-      new GetCommand({
+    const res = await db.send(
+      new GetItemCommand({
         TableName: USER_ROBOT_TRIAL_CONSUMPTION_TABLE_NAME,
-        Key: { userId, robotId: robotIdStr },
+        Key: { userId: { S: userId }, robotId: { S: robotIdStr } },
+        ProjectionExpression: 'userId',
       }),
     );
     return Boolean(res.Item);
@@ -1348,12 +1540,13 @@ async function createSession(
         }
         const partnerTableId = robotItem.partnerId?.S;
         if (partnerTableId && PARTNER_TABLE_NAME) {
-          const partnerResult = await docClient.send(new GetCommand({
+          const partnerResult = await db.send(new GetItemCommand({
             TableName: PARTNER_TABLE_NAME,
-            Key: { id: partnerTableId },
+            Key: { id: { S: partnerTableId } },
+            ProjectionExpression: 'cognitoUsername, contactEmail',
           }));
-          const cognitoUsername = partnerResult.Item?.cognitoUsername;
-          const contactEmail = partnerResult.Item?.contactEmail;
+          const cognitoUsername = partnerResult.Item?.cognitoUsername?.S;
+          const contactEmail = partnerResult.Item?.contactEmail?.S;
           if (cognitoUsername) {
             partnerIdCognito = cognitoUsername;
             partnerOwnerIdentifiers.push(cognitoUsername);
@@ -1552,7 +1745,7 @@ async function endUserSessions(userId: string): Promise<void> {
         await endSession(sessionId, SESSION_END_REASON.USER_SESSIONS_CLEARED);
         if (SETTLE_SESSION_PAYMENT_FUNCTION_NAME) {
           try {
-            await lambdaClient.send(new InvokeCommand({
+            await getLambdaClient().send(new InvokeCommand({
               FunctionName: SETTLE_SESSION_PAYMENT_FUNCTION_NAME,
               InvocationType: 'Event',
               Payload: JSON.stringify({ sessionId }),
@@ -1594,14 +1787,15 @@ async function getRobotByRobotId(robotId: string): Promise<RobotItemShape> {
 async function getPartnerOwnerIdentifier(partnerId: string): Promise<string | undefined> {
   if (!PARTNER_TABLE_NAME) return undefined;
   try {
-    const res = await docClient.send(
-      new GetCommand({
+    const res = await db.send(
+      new GetItemCommand({
         TableName: PARTNER_TABLE_NAME,
-        Key: { id: partnerId },
+        Key: { id: { S: partnerId } },
+        ProjectionExpression: '#owner, cognitoUsername',
+        ExpressionAttributeNames: { '#owner': 'owner' },
       }),
     );
-    const item = res.Item as { owner?: string; cognitoUsername?: string } | undefined;
-    return item?.owner ?? item?.cognitoUsername;
+    return res.Item?.owner?.S ?? res.Item?.cognitoUsername?.S;
   } catch {
     return undefined;
   }
@@ -1687,6 +1881,7 @@ async function cleanupRobotPresenceOnDisconnect(connectionId: string): Promise<v
               Key: { robotId: { S: robotId } },
             })
           );
+          forgetRobotPresence(robotId);
           console.log('[DISCONNECT] Removed robot presence:', { robotId, connectionId });
         }
       }
@@ -1727,7 +1922,7 @@ async function endConnectionSessions(connectionId: string): Promise<void> {
         await endSession(sessionId, SESSION_END_REASON.WEBSOCKET_DISCONNECT);
         if (SETTLE_SESSION_PAYMENT_FUNCTION_NAME) {
           try {
-            await lambdaClient.send(new InvokeCommand({
+            await getLambdaClient().send(new InvokeCommand({
               FunctionName: SETTLE_SESSION_PAYMENT_FUNCTION_NAME,
               InvocationType: 'Event',
               Payload: JSON.stringify({ sessionId }),
@@ -1747,6 +1942,20 @@ async function endConnectionSessions(connectionId: string): Promise<void> {
   }
 }
 
+/**
+ * Connection-row `groups` attribute as a String Set. Omitted when there are no groups
+ * (DynamoDB sets cannot be empty), so the common no-group client writes nothing.
+ */
+function connectionGroupsAttribute(groups?: readonly string[]): { groups?: AttributeValue } {
+  return groups && groups.length > 0 ? { groups: { SS: [...new Set(groups)] } } : {};
+}
+
+/** Reads connection-row groups: String Set, or the legacy comma-joined String from older rows. */
+function parseConnectionGroups(attr: AttributeValue | undefined): readonly string[] {
+  if (attr?.SS) return attr.SS;
+  return attr?.S ? attr.S.split(',').filter(Boolean) : NO_GROUPS;
+}
+
 // ---------------------------------
 // $connect
 // ---------------------------------
@@ -1781,7 +1990,7 @@ async function onConnect(event: APIGatewayProxyEvent): Promise<APIGatewayProxyRe
                             connectionId: { S: connectionId },
                             userId: { S: 'dev-test-user' },
                             username: { S: 'dev-test-user' },
-                            groups: { S: 'PARTNERS' },
+                            ...connectionGroupsAttribute(['PARTNERS']),
                             kind: { S: 'client' },
                             ts: { N: String(Date.now()) },
                         },
@@ -1844,7 +2053,7 @@ async function onConnect(event: APIGatewayProxyEvent): Promise<APIGatewayProxyRe
     }
 
     try {
-        // Store username/email for ACL checks
+        // Store username/email for ACL checks (empty email and groups are omitted to keep the row small)
         const email = claims.email || '';
         const username = claims['cognito:username'] || claims.email || claims.sub || '';
         await db.send(
@@ -1854,12 +2063,15 @@ async function onConnect(event: APIGatewayProxyEvent): Promise<APIGatewayProxyRe
                     connectionId: { S: connectionId},
                     userId: { S: claims.sub },
                     username: { S: username },
-                    email: { S: email },
-                    groups: { S: (claims.groups ?? []).join(',')},
+                    ...(email ? { email: { S: email } } : {}),
+                    ...connectionGroupsAttribute(claims.groups),
                     kind: { S: 'client' },
                     ts: { N: String(Date.now()) },
                     // monitoringRobotId will be set when monitor message is received
                 },
+                // A replayed $connect (or an SDK retry after a lost response) must not overwrite the row,
+                // which by then may carry monitoringRobotId or protocol fields set by later messages
+                ConditionExpression: 'attribute_not_exists(connectionId)',
             }),
         );
         console.log('[CONNECTION_SUCCESS]', {
@@ -1869,6 +2081,10 @@ async function onConnect(event: APIGatewayProxyEvent): Promise<APIGatewayProxyRe
             groups: claims.groups,
         });
     } catch (e) {
+        if ((e as { name?: string })?.name === 'ConditionalCheckFailedException') {
+            console.log('[CONNECTION_ALREADY_STORED]', { connectionId, userId: claims.sub });
+            return { statusCode: 200, body: '' };
+        }
         console.warn('Connect put_item error', e);
         console.error('[CONNECTION_ERROR]', { connectionId, error: String(e) });
     }
@@ -1883,6 +2099,7 @@ async function onDisconnect(event: APIGatewayProxyEvent): Promise<APIGatewayProx
     const connectionId = event.requestContext.connectionId!;
 
     // Remove robot presence if this connection was a robot (ensures "offline" status)
+    forgetPresenceForConnection(connectionId);
     await cleanupRobotPresenceOnDisconnect(connectionId);
 
     await endConnectionSessions(connectionId);
@@ -1910,6 +2127,7 @@ async function onDisconnect(event: APIGatewayProxyEvent): Promise<APIGatewayProx
 async function handlePkiResponse(
   event: APIGatewayProxyEvent,
   msg: InboundMessage,
+  raw: RawMessage,
 ): Promise<APIGatewayProxyResult> {
   const connectionId = event.requestContext.connectionId!;
   const signature = msg.signature?.trim();
@@ -1999,6 +2217,7 @@ async function handlePkiResponse(
     }
     throw e;
   }
+  forgetRobotPresence(robotId);
 
   // Persist robotId, clear PKI_PENDING kind so the auth middleware grants full access,
   // and remove the one-time challenge fields
@@ -2012,11 +2231,7 @@ async function handlePkiResponse(
 
   console.log('[PKI_RESPONSE_VERIFIED]', { connectionId, robotId });
 
-  let incomingId: string | undefined;
-  try {
-    const rawBody = JSON.parse(event.body ?? '{}');
-    incomingId = typeof rawBody.id === 'string' ? rawBody.id : undefined;
-  } catch { /* ignore */ }
+  const incomingId = typeof raw.id === 'string' ? raw.id : undefined;
 
   try {
     await postFormatted(connectionId, { type: 'pki_verified', agentId: robotId, correlationId: incomingId });
@@ -2038,6 +2253,8 @@ async function handleRegister(
 ): Promise<APIGatewayProxyResult> {
   const robotId = msg.robotId?.trim();
   const connectionId = event.requestContext.connectionId!;
+  // Single clock read shared by presence, challenge, and monitor timestamps for this registration
+  const nowMs = Date.now();
 
   if (!robotId) {
     console.error('[REGISTER_ERROR]', {
@@ -2077,7 +2294,7 @@ async function handleRegister(
             ownerUserId: { S: ownerId },
             connectionId: { S: connectionId },
             status: { S: 'pending' },
-            updatedAt: { N: String(Date.now()) },
+            updatedAt: { N: String(nowMs) },
           },
           ConditionExpression: 'attribute_not_exists(robotId) OR connectionId = :conn',
           ExpressionAttributeValues: {
@@ -2093,6 +2310,7 @@ async function handleRegister(
       console.warn('Presence put_item error (pending)', e);
       return errorResponse(500, 'DynamoDB error');
     }
+    forgetRobotPresence(robotId);
     const nonce = randomBytes(PKI_CHALLENGE_NONCE_BYTES);
     const challengeBase64 = nonce.toString('base64');
     await db.send(
@@ -2103,7 +2321,7 @@ async function handleRegister(
         ExpressionAttributeValues: {
           ':c': { S: challengeBase64 },
           ':r': { S: robotId },
-          ':ts': { N: String(Date.now()) },
+          ':ts': { N: String(nowMs) },
         },
       }),
     );
@@ -2120,7 +2338,7 @@ async function handleRegister(
       _monitor: true,
       _source: connectionId,
       _direction: 'robot-to-server',
-      timestamp: new Date().toISOString(),
+      timestamp: new Date(nowMs).toISOString(),
     };
     await notifyMonitors(robotId, monitorMessage);
     return { statusCode: 200, body: '' };
@@ -2141,6 +2359,8 @@ async function handleRegister(
   });
 
   try {
+    // Admins may force-claim a robot registered by another owner, so their write is unconditional;
+    // everyone else must own the row (or find it unclaimed). One PutItem either way.
     await db.send(
       new PutItemCommand({
         TableName: ROBOT_PRESENCE_TABLE,
@@ -2149,42 +2369,30 @@ async function handleRegister(
           ownerUserId: { S: caller },
           connectionId: { S: connectionId },
           status: { S: 'online' },
-          updatedAt: { N: String(Date.now()) },
+          updatedAt: { N: String(nowMs) },
         },
-        ConditionExpression: 'attribute_not_exists(ownerUserId) OR ownerUserId = :me',
-        ExpressionAttributeValues: { ':me': { S: caller } },
+        ...(!admin && {
+          ConditionExpression: 'attribute_not_exists(ownerUserId) OR ownerUserId = :me',
+          ExpressionAttributeValues: { ':me': { S: caller } },
+        }),
       }),
     );
   } catch (e: unknown) {
     const err = e as { name?: string; Code?: string; code?: string };
     const code = err?.name || err?.Code || err?.code;
-    if (code === 'ConditionalCheckFailedException' && !admin) {
+    if (code === 'ConditionalCheckFailedException') {
       return errorResponse(409, 'Robot is already registered by another owner');
     }
-    if (code === 'ConditionalCheckFailedException' && admin) {
-      await db.send(
-        new PutItemCommand({
-          TableName: ROBOT_PRESENCE_TABLE,
-          Item: {
-            robotId: { S: robotId },
-            ownerUserId: { S: caller },
-            connectionId: { S: connectionId },
-            status: { S: 'online' },
-            updatedAt: { N: String(Date.now()) },
-          },
-        }),
-      );
-    } else {
-      console.warn('Presence put_item error', e);
-      console.error('[REGISTER_ERROR]', {
-        connectionId,
-        robotId,
-        error: e instanceof Error ? e.message : String(e),
-        errorCode: err?.name || err?.Code || err?.code,
-      });
-      return errorResponse(500, 'DynamoDB error');
-    }
+    console.warn('Presence put_item error', e);
+    console.error('[REGISTER_ERROR]', {
+      connectionId,
+      robotId,
+      error: e instanceof Error ? e.message : String(e),
+      errorCode: code,
+    });
+    return errorResponse(500, 'DynamoDB error');
   }
+  forgetRobotPresence(robotId);
 
   // Persist robotId on the connection record so handleSignal can resolve it
   // from connectionId alone (robot doesn't need to include robotId in every message)
@@ -2214,7 +2422,7 @@ async function handleRegister(
     _monitor: true,
     _source: connectionId,
     _direction: 'robot-to-server',
-    timestamp: new Date().toISOString(),
+    timestamp: new Date(nowMs).toISOString(),
   };
   await notifyMonitors(robotId, monitorMessage);
 
@@ -2226,7 +2434,7 @@ async function handleRegister(
 // ---------------------------------
 
 async function handleMonitor(
-  claims: { sub?: string; groups?: string[] },
+  claims: { sub?: string; groups?: readonly string[] },
   event: APIGatewayProxyEvent,
   msg: InboundMessage,
 ): Promise<APIGatewayProxyResult> {
@@ -2271,7 +2479,7 @@ async function handleMonitor(
         connectionId: { S: connectionId },
         userId: { S: claims.sub ?? '' },
         username: { S: claimsTyped['cognito:username'] || claimsTyped.email || claims.sub || '' },
-        groups: { S: (claims.groups ?? []).join(',') },
+        ...connectionGroupsAttribute(claims.groups),
         kind: { S: 'monitor' },
         monitoringRobotId: { S: robotId }, // Store which robot this connection is monitoring
         ts: { N: String(Date.now()) },
@@ -2319,7 +2527,7 @@ async function handleMonitor(
 async function getMonitoringConnections(robotId: string): Promise<string[]> {
   try {
     // Use GSI (monitoringRobotIdIndex) for fast, direct lookup instead of scanning entire table
-    console.log('[MONITOR_QUERY_START]', { robotId });
+    console.debug('[MONITOR_QUERY_START]', { robotId });
     const result = await db.send(
       new QueryCommand({
         TableName: CONN_TABLE,
@@ -2336,7 +2544,7 @@ async function getMonitoringConnections(robotId: string): Promise<string[]> {
       .map(item => item.connectionId?.S)
       .filter((id): id is string => !!id);
     
-    console.log('[MONITOR_QUERY_RESULT]', { 
+    console.debug('[MONITOR_QUERY_RESULT]', { 
       robotId, 
       foundConnections: connections.length,
       connectionIds: connections 
@@ -2355,11 +2563,11 @@ type MessageWithType = { type?: string };
 // Helper function to send message copies to monitoring connections
 async function notifyMonitors(robotId: string, message: unknown): Promise<void> {
   const msgType = (message as MessageWithType)?.type;
-  console.log('[NOTIFY_MONITORS_START]', { robotId, messageType: msgType });
+  console.debug('[NOTIFY_MONITORS_START]', { robotId, messageType: msgType });
   const monitorConnections = await getMonitoringConnections(robotId);
   
   if (monitorConnections.length === 0) {
-    console.log('[NOTIFY_MONITORS_SKIP]', { 
+    console.debug('[NOTIFY_MONITORS_SKIP]', { 
       robotId, 
       reason: 'No monitoring connections found',
       messageType: msgType 
@@ -2368,25 +2576,20 @@ async function notifyMonitors(robotId: string, message: unknown): Promise<void>
   }
 
   // Send copy to all monitoring connections
-  const notifyPromises = monitorConnections.map(async (connId) => {
-    try {
-      await postTo(connId, message);
-    } catch (err: unknown) {
-      // Ignore GoneException (connection already closed)
-      if ((err as { name?: string })?.name !== 'GoneException') {
-        console.warn('[MONITOR_NOTIFY_ERROR]', {
-          connectionId: connId,
-          robotId,
-          error: err instanceof Error ? err.message : String(err),
-        });
-      }
+  const results = await postToMany(monitorConnections.map((connId) => [connId, message]));
+  results.forEach((result, i) => {
+    // Ignore GoneException (connection already closed)
+    if (result.status === 'rejected' && (result.reason as { name?: string })?.name !== 'GoneException') {
+      console.warn('[MONITOR_NOTIFY_ERROR]', {
+        connectionId: monitorConnections[i],
+        robotId,
+        error: result.reason instanceof Error ? result.reason.message : String(result.reason),
+      });
     }
   });
-
-  await Promise.allSettled(notifyPromises);
   
   if (monitorConnections.length > 0) {
-    console.log('[MONITOR_NOTIFIED]', {
+    console.debug('[MONITOR_NOTIFIED]', {
       robotId,
       monitorCount: monitorConnections.length,
     });
@@ -2398,21 +2601,17 @@ async function notifyMonitors(robotId: string, message: unknown): Promise<void>
 // ---------------------------------
 
 async function handleTakeover(
-  claims: { sub?: string; groups?: string[] },
+  claims: { sub?: string; groups?: readonly string[] },
   msg: InboundMessage,
 ): Promise<APIGatewayProxyResult> {
   const robotId = msg.robotId?.trim();
   if (!robotId) return errorResponse(400, 'robotId required');
 
-  // Need owner + connection to notify
-  const got = await db.send(new GetItemCommand({
-    TableName: ROBOT_PRESENCE_TABLE,
-    Key: { robotId: { S: robotId } },
-    ProjectionExpression: 'ownerUserId,connectionId',
-  }));
+  // Need owner + connection to notify; the same row answers the owner check below
+  const presence = await getRobotPresence(robotId);
 
-  const owner = got.Item?.ownerUserId?.S;
-  const robotConn = got.Item?.connectionId?.S;
+  const owner = presence?.ownerUserId?.S;
+  const robotConn = presence?.connectionId?.S;
 
   if (!owner || !robotConn) {
     return errorResponse(404, 'robot offline');
@@ -2421,7 +2620,7 @@ async function handleTakeover(
   const caller = claims.sub ?? '';
 
   // Check if caller is owner, admin, or delegated operator
-  const isAuthorized = await isOwnerOrAdmin(robotId, claims);
+  const isAuthorized = await isOwnerOrAdmin(robotId, claims, presence);
   if (!isAuthorized) {
     return errorResponse(403, 'forbidden');
   }
@@ -2439,13 +2638,15 @@ async function handleTakeover(
 // Offer / Answer / Ice-candidate forward
 // ---------------------------------
 async function handleSignal(
-  claims: { sub?: string; groups?: string[] },
+  claims: { sub?: string; groups?: readonly string[] },
   event: APIGatewayProxyEvent,
   msg: InboundMessage,
+  raw: RawMessage,
 ): Promise<APIGatewayProxyResult> {
   let robotId = msg.robotId?.trim();
   const type = msg.type;
   const sourceConnId = event.requestContext.connectionId!;
+  let robotIdFromConnection = false;
 
   // If robotId is missing, resolve it from the connection record.
   // Robots store their robotId on CONN_TABLE during registration, so answer/ice_candidate
@@ -2460,7 +2661,8 @@ async function handleSignal(
       const resolved = connLookup.Item?.robotId?.S?.trim();
       if (resolved) {
         robotId = resolved;
-        console.log('[HANDLE_SIGNAL_RESOLVED_ROBOT_ID]', { connectionId: sourceConnId, robotId });
+        robotIdFromConnection = true;
+        console.debug('[HANDLE_SIGNAL_RESOLVED_ROBOT_ID]', { connectionId: sourceConnId, robotId });
       }
     } catch (e) {
       console.warn('[HANDLE_SIGNAL] Failed to resolve robotId from connection:', e);
@@ -2468,7 +2670,7 @@ async function handleSignal(
   }
 
   // Log the incoming message for debugging
-  console.log('[HANDLE_SIGNAL_INPUT]', {
+  console.debug('[HANDLE_SIGNAL_INPUT]', {
     robotId,
     type,
     hasRobotId: !!robotId,
@@ -2492,18 +2694,23 @@ async function handleSignal(
   // Fetch robot presence once and reuse for: is-from-robot check, ACL (owner), and target connectionId.
   // This avoids 2 extra GetItem calls per message (saves DynamoDB read cost and latency).
   let robotPresenceItem: RobotPresenceItem = undefined;
+  let presenceFromCache = false;
   let isFromRobot = false;
   try {
-    const robotPresence = await db.send(new GetItemCommand({
-      TableName: ROBOT_PRESENCE_TABLE,
-      Key: { robotId: { S: robotId } },
-      ProjectionExpression: 'connectionId, ownerUserId, #status',
-      ExpressionAttributeNames: { '#status': 'status' },
-    }));
-    robotPresenceItem = robotPresence.Item as RobotPresenceItem;
+    ({ item: robotPresenceItem, fromCache: presenceFromCache } = await lookupRobotPresence(robotId, false));
+    // A robot that reconnected through another container can still be cached under its old connection.
+    // For senders known to be the robot (robotId from its connection row, or PKI claims), re-read
+    // before classifying the frame as client traffic.
+    if (
+      presenceFromCache &&
+      robotPresenceItem?.connectionId?.S !== sourceConnId &&
+      (robotIdFromConnection || claims.sub === robotId)
+    ) {
+      ({ item: robotPresenceItem, fromCache: presenceFromCache } = await lookupRobotPresence(robotId, true));
+    }
     if (robotPresenceItem?.connectionId?.S === sourceConnId) {
       isFromRobot = true;
-      console.log('[ROBOT_DETECTED]', {
+      console.debug('[ROBOT_DETECTED]', {
         robotId,
         sourceConnectionId: sourceConnId,
         robotConnectionId: robotPresenceItem.connectionId.S,
@@ -2516,28 +2723,23 @@ async function handleSignal(
   // If we detected it's from a robot but don't have clientConnectionId, try to get it from the original message
   // This handles legacy 'to' field and new-protocol payload.connectionId
   if (isFromRobot && !msg.clientConnectionId) {
-    try {
-      const rawBody = JSON.parse(event.body ?? '{}') as Record<string, unknown>;
-      if (typeof rawBody.to === 'string' && rawBody.to.trim().length > 0 && rawBody.to !== robotId) {
-        msg.clientConnectionId = rawBody.to.trim();
-        console.log('[EXTRACTED_CLIENT_CONNECTION_ID]', {
+    if (typeof raw.to === 'string' && raw.to.trim().length > 0 && raw.to !== robotId) {
+      msg.clientConnectionId = raw.to.trim();
+      console.debug('[EXTRACTED_CLIENT_CONNECTION_ID]', {
+        robotId,
+        clientConnectionId: msg.clientConnectionId,
+        fromOriginalTo: raw.to,
+      });
+    } else {
+      const p = raw.payload as Record<string, unknown> | undefined;
+      if (p && typeof p === 'object' && typeof p.connectionId === 'string' && p.connectionId.trim().length > 0) {
+        msg.clientConnectionId = p.connectionId.trim();
+        console.debug('[EXTRACTED_CLIENT_CONNECTION_ID]', {
           robotId,
           clientConnectionId: msg.clientConnectionId,
-          fromOriginalTo: rawBody.to,
+          fromPayloadConnectionId: true,
         });
-      } else {
-        const p = rawBody.payload as Record<string, unknown> | undefined;
-        if (p && typeof p.connectionId === 'string' && p.connectionId.trim().length > 0) {
-          msg.clientConnectionId = p.connectionId.trim();
-          console.log('[EXTRACTED_CLIENT_CONNECTION_ID]', {
-            robotId,
-            clientConnectionId: msg.clientConnectionId,
-            fromPayloadConnectionId: true,
-          });
-        }
       }
-    } catch (e) {
-      console.warn('Failed to extract clientConnectionId from original message:', e);
     }
   }
   
@@ -2748,7 +2950,7 @@ async function handleSignal(
   }
 
   // Log packet forwarding for verification
-  console.log('[PACKET_FORWARD]', {
+  console.debug('[PACKET_FORWARD]', {
     timestamp: new Date().toISOString(),
     sourceConnectionId: sourceConnId,
     targetConnectionId: targetConn,
@@ -2758,8 +2960,9 @@ async function handleSignal(
     target: target,
   });
 
-  // Send copy to monitoring connections FIRST (before attempting to send)
-  // This ensures messages appear in logger even if they can't be sent (e.g., placeholder client IDs)
+  // Start the copy to monitoring connections FIRST (before attempting to send) and let it run
+  // alongside the forward below. This ensures messages appear in logger even if they can't be sent
+  // (e.g., placeholder client IDs); notifyMonitors never rejects.
   const monitorMessage = {
     ...outbound,
     _monitor: true, // Flag to indicate this is a monitor copy
@@ -2767,17 +2970,41 @@ async function handleSignal(
     _target: targetConn,
     _direction: target === 'robot' ? 'client-to-robot' : 'robot-to-client',
   };
-  await notifyMonitors(robotId, monitorMessage);
+  const monitorsNotified = notifyMonitors(robotId, monitorMessage);
 
   // Only attempt to send if we have a valid target connection (not a placeholder)
   if (targetConn && targetConn !== 'PLACEHOLDER_NO_CLIENT') {
     try {
       // Use recipient's protocol so legacy robots get legacy format and new-protocol robots get envelope (signalling.offer). Mixed client/robot protocol combos work correctly.
-      await postFormatted(targetConn, outbound as InternalOutboundMessage);
-      console.log('[PACKET_FORWARD_SUCCESS]', {
-        targetConnectionId: targetConn,
-        messageType: type,
-      });
+      let delivered = await postFormatted(targetConn, outbound as InternalOutboundMessage);
+      if (!delivered && target === 'robot' && presenceFromCache) {
+        // The cached presence row pointed at a closed socket: the robot may have reconnected through
+        // another container. Re-read the row and retry once on its current connection.
+        const current = await getRobotPresence(robotId, { fresh: true });
+        const currentConn = current?.connectionId?.S;
+        if (currentConn === sourceConnId) {
+          // The sender is the robot itself, on a connection newer than the stale row. Presence is now
+          // refreshed, so classify the frame again; this time it routes to the client.
+          await monitorsNotified;
+          return handleSignal(claims, event, msg, raw);
+        }
+        if (currentConn && currentConn !== targetConn && current?.status?.S !== 'pending') {
+          console.log('[PACKET_FORWARD_REROUTED]', { robotId, staleConnectionId: targetConn, targetConnectionId: currentConn });
+          targetConn = currentConn;
+          delivered = await postFormatted(targetConn, outbound as InternalOutboundMessage);
+        }
+      }
+      if (delivered) {
+        console.debug('[PACKET_FORWARD_SUCCESS]', {
+          targetConnectionId: targetConn,
+          messageType: type,
+        });
+      } else {
+        console.warn('[PACKET_FORWARD_GONE]', {
+          targetConnectionId: targetConn,
+          messageType: type,
+        });
+      }
       
       if (type === 'offer' && target === 'robot' && claims?.sub) {
         const sessionUserId = userEmailOrUsername || claims.sub;
@@ -2838,9 +3065,156 @@ async function handleSignal(
     });
   }
 
+  await monitorsNotified;
   return { statusCode: 200, body: '' };
 }
 
+// ---------------------------------
+// Liveness / capabilities
+// ---------------------------------
+
+// Handle signalling.pong - record lastPongAt for liveness checks
+async function handleSignallingPong(connectionId: string, raw: RawMessage): Promise<APIGatewayProxyResult> {
+  const now = Date.now();
+  try {
+    await db.send(
+      new UpdateItemCommand({
+        TableName: CONN_TABLE,
+        Key: { connectionId: { S: connectionId } },
+        UpdateExpression: 'SET lastPongAt = :ts',
+        ExpressionAttributeValues: { ':ts': { N: String(now) } },
+      })
+    );
+    console.debug('[AGENT_PONG_RECEIVED]', {
+      connectionId,
+      correlationId: raw.correlationId,
+      lastPongAt: now,
+    });
+  } catch (err) {
+    console.warn('[AGENT_PONG_UPDATE_ERROR]', {
+      connectionId,
+      error: err instanceof Error ? err.message : String(err),
+    });
+  }
+  return successResponse({ type: 'signalling.pong-acknowledged' });
+}
+
+// Handle legacy pong - also record lastPongAt for backward compatibility
+async function handleLegacyPong(connectionId: string, raw: RawMessage): Promise<APIGatewayProxyResult> {
+  const now = Date.now();
+  try {
+    await db.send(
+      new UpdateItemCommand({
+        TableName: CONN_TABLE,
+        Key: { connectionId: { S: connectionId } },
+        UpdateExpression: 'SET lastPongAt = :ts',
+        ExpressionAttributeValues: { ':ts': { N: String(now) } },
+      })
+    );
+    console.debug('[PONG_RECEIVED]', {
+      connectionId,
+      timestamp: raw.timestamp || 'not provided',
+      lastPongAt: now,
+    });
+  } catch (err) {
+    console.warn('[PONG_UPDATE_ERROR]', { connectionId, error: err instanceof Error ? err.message : String(err) });
+  }
+  return successResponse({ type: 'pong-acknowledged' });
+}
+
+// Handle signalling.capabilities (Ctrlr interface spec) - return supported versions
+async function handleCapabilities(connectionId: string): Promise<APIGatewayProxyResult> {
+  try {
+    await postFormatted(connectionId, {
+      type: 'signalling.capabilities',
+      supportedVersions: SUPPORTED_PROTOCOL_VERSIONS,
+    });
+    return successResponse({ type: 'signalling.capabilities-sent' });
+  } catch (e) {
+    console.warn('[CAPABILITIES_RESPONSE_ERROR]', { connectionId, error: e instanceof Error ? e.message : String(e) });
+    return errorResponse(500, 'Failed to send capabilities');
+  }
+}
+
+// Handle ping / signalling.ping - respond with signalling.pong
+async function handlePing(connectionId: string, raw: RawMessage): Promise<APIGatewayProxyResult> {
+  const pingId = raw.id ?? raw.timestamp ?? String(Date.now());
+  try {
+    await postTo(connectionId, {
+      type: 'signalling.pong',
+      version: '0.0',
+      id: `${pingId}-pong`,
+      correlationId: pingId,
+      timestamp: new Date().toISOString(),
+    });
+    console.debug('[PING_RESPONDED]', {
+      connectionId,
+      pingId,
+    });
+  } catch (err) {
+    console.warn('[PING_RESPONSE_ERROR]', {
+      connectionId,
+      error: err instanceof Error ? err.message : String(err),
+    });
+  }
+  return successResponse({ type: 'ping-acknowledged' });
+}
+
+// ---------------------------------
+// $default dispatch
+// ---------------------------------
+
+/** Handles one normalized $default message type. */
+type RouteHandler = (
+  claims: Claims,
+  event: APIGatewayProxyEvent,
+  msg: InboundMessage,
+  raw: RawMessage,
+) => Promise<APIGatewayProxyResult>;
+
+const signalRoute: RouteHandler = (claims, event, msg, raw) => {
+  console.debug('[ROUTING_TO_HANDLE_SIGNAL]', {
+    type: msg.type,
+    robotId: msg.robotId,
+    hasClaims: !!claims?.sub,
+  });
+  return handleSignal(claims, event, msg, raw);
+};
+
+const pingRoute: RouteHandler = (_claims, event, _msg, raw) =>
+  handlePing(event.requestContext.connectionId!, raw);
+
+/** Routes keyed by normalized (lower-case) message type: one Map lookup per frame instead of an if/else chain. */
+const MESSAGE_ROUTES: ReadonlyMap<string, RouteHandler> = new Map<string, RouteHandler>([
+  ['register', (claims, event, msg) => {
+    console.log('[REGISTER_ATTEMPT]', {
+      connectionId: event.requestContext.connectionId,
+      robotId: msg.robotId,
+      userId: claims?.sub,
+    });
+    return handleRegister(claims, event, msg);
+  }],
+  ['pki-response', (_claims, event, msg, raw) => handlePkiResponse(event, msg, raw)],
+  ['monitor', (claims, event, msg) => {
+    console.log('[MONITOR_MESSAGE_RECEIVED]', {
+      connectionId: event.requestContext.connectionId,
+      robotId: msg.robotId,
+      userId: claims?.sub,
+      message: msg,
+    });
+    return handleMonitor(claims, event, msg);
+  }],
+  ['takeover', (claims, _event, msg) => handleTakeover(claims, msg)],
+  ['offer', signalRoute],
+  ['answer', signalRoute],
+  ['ice-candidate', signalRoute],
+  ['signalling.pong', (_claims, event, _msg, raw) => handleSignallingPong(event.requestContext.connectionId!, raw)],
+  ['pong', (_claims, event, _msg, raw) => handleLegacyPong(event.requestContext.connectionId!, raw)],
+  ['signalling.capabilities', (_claims, event) => handleCapabilities(event.requestContext.connectionId!)],
+  ['ping', pingRoute],
+  ['signalling.ping', pingRoute],
+]);
+
 // ---------------------------------
 // Lambda entry point
 // ---------------------------------
@@ -2850,8 +3224,9 @@ export async function handler(
 ): Promise<APIGatewayProxyResult> {
   const route = event.requestContext.routeKey;
   
-  // Log all incoming events to help debug routing issues
-  console.log('[LAMBDA_INVOCATION]', {
+  // Log all incoming events to help debug routing issues. Per-message trace logs use console.debug,
+  // which the runtime drops at the function's default 'info' level (see resource.ts logging).
+  console.debug('[LAMBDA_INVOCATION]', {
     route: route,
     connectionId: event.requestContext.connectionId,
     eventType: event.requestContext.eventType,
@@ -2871,7 +3246,7 @@ export async function handler(
   const connectionId = event.requestContext.connectionId!;
   
   // Log that we're using the new authentication method
-  console.log('[AUTH_METHOD_NEW]', {
+  console.debug('[AUTH_METHOD_NEW]', {
     connectionId,
     timestamp: new Date().toISOString(),
     message: 'Using connection table lookup for authentication',
@@ -2899,8 +3274,7 @@ export async function handler(
       const connTs = connItem.Item.ts?.N;
       const username = connItem.Item.username?.S;
       const email = connItem.Item.email?.S;
-      const groupsStr = connItem.Item.groups?.S || '';
-      const groups = groupsStr ? groupsStr.split(',').filter(Boolean) : [];
+      const groups = parseConnectionGroups(connItem.Item.groups);
       
       if (userId) {
         claims = {
@@ -2909,7 +3283,7 @@ export async function handler(
           'cognito:username': username,
           email: email || (username?.includes('@') ? username : undefined),
         };
-        console.log('[AUTH_FROM_CONNECTION_TABLE]', {
+        console.debug('[AUTH_FROM_CONNECTION_TABLE]', {
           connectionId,
           userId,
           username,
@@ -2919,7 +3293,7 @@ export async function handler(
         // PKI-authenticated robot connection — use robotId as the identity
         const robotId = connItem.Item.robotId?.S;
         claims = { sub: robotId };
-        console.log('[AUTH_ROBOT]', { connectionId, robotId });
+        console.debug('[AUTH_ROBOT]', { connectionId, robotId });
       } else if (kind === 'client_pki_pending') {
         // Close PKI-pending connections that have not completed auth within the timeout window
         const tsMs = connTs ? parseInt(connTs, 10) : NaN;
@@ -2927,14 +3301,14 @@ export async function handler(
         if (Number.isFinite(tsMs) && ageMs > PKI_PENDING_TIMEOUT_MS) {
           console.log('[PKI_PENDING_TIMEOUT]', { connectionId, ageMs, thresholdMs: PKI_PENDING_TIMEOUT_MS });
           try {
-            await mgmt.send(new DeleteConnectionCommand({ ConnectionId: connectionId }));
+            await getMgmt().send(new DeleteConnectionCommand({ ConnectionId: connectionId }));
           } catch (e) {
             console.warn('[PKI_PENDING_TIMEOUT] DeleteConnection failed (connection may already be closed):', e instanceof Error ? e.message : String(e));
           }
           return errorResponse(403, 'PKI authentication timeout');
         }
         claims = { pkiPending: true };
-        console.log('[AUTH_PKI_PENDING]', { connectionId });
+        console.debug('[AUTH_PKI_PENDING]', { connectionId });
       } else {
         console.warn('[AUTH_LOOKUP_MISSING_USERID]', {
           connectionId,
@@ -2981,7 +3355,7 @@ export async function handler(
     }
   }
 
-  // Parse raw JSON
+  // Parse raw JSON once; handlers below read fields from `raw` rather than re-parsing event.body
   let raw: RawMessage = {};
   try {
     raw = JSON.parse(event.body ?? '{}');
@@ -3043,7 +3417,7 @@ export async function handler(
   }
 
   // Log incoming message
-  console.log('[MESSAGE_RECEIVED]', {
+  console.debug('[MESSAGE_RECEIVED]', {
     connectionId: event.requestContext.connectionId,
     route: route,
     messageType: type,
@@ -3076,130 +3450,9 @@ export async function handler(
   }
 
   // Dispatch by message type
-  if (type === 'register') {
-    console.log('[REGISTER_ATTEMPT]', {
-      connectionId: event.requestContext.connectionId,
-      robotId: msg.robotId,
-      userId: claims?.sub,
-    });
-    return handleRegister(claims, event, msg);
-  }
-
-  if (type === 'pki-response') {
-    return handlePkiResponse(event, msg);
-  }
-
-  if (type === 'monitor') {
-    console.log('[MONITOR_MESSAGE_RECEIVED]', {
-      connectionId: event.requestContext.connectionId,
-      robotId: msg.robotId,
-      userId: claims?.sub,
-      message: msg,
-    });
-    return handleMonitor(claims, event, msg);
-  }
-
-  if (type === 'takeover') {
-    return handleTakeover(claims, msg);
-  }
-
-  if (type === 'offer' || type === 'answer' || type === 'ice-candidate') {
-    console.log('[ROUTING_TO_HANDLE_SIGNAL]', {
-      type,
-      robotId: msg.robotId,
-      hasClaims: !!claims?.sub,
-    });
-    return handleSignal(claims, event, msg);
-  }
-
-  // Handle signalling.pong - record lastPongAt for liveness checks
-  if (type === 'signalling.pong') {
-    const rawBody = event.body ? JSON.parse(event.body) : {};
-    const now = Date.now();
-    try {
-      await db.send(
-        new UpdateItemCommand({
-          TableName: CONN_TABLE,
-          Key: { connectionId: { S: connectionId } },
-          UpdateExpression: 'SET lastPongAt = :ts',
-          ExpressionAttributeValues: { ':ts': { N: String(now) } },
-        })
-      );
-      console.log('[AGENT_PONG_RECEIVED]', {
-        connectionId,
-        correlationId: rawBody.correlationId,
-        lastPongAt: now,
-      });
-    } catch (err) {
-      console.warn('[AGENT_PONG_UPDATE_ERROR]', {
-        connectionId,
-        error: err instanceof Error ? err.message : String(err),
-      });
-    }
-    return successResponse({ type: 'signalling.pong-acknowledged' });
-  }
-
-  // Handle legacy pong - also record lastPongAt for backward compatibility
-  if (type === 'pong') {
-    const rawBody = event.body ? JSON.parse(event.body) : {};
-    const now = Date.now();
-    try {
-      await db.send(
-        new UpdateItemCommand({
-          TableName: CONN_TABLE,
-          Key: { connectionId: { S: connectionId } },
-          UpdateExpression: 'SET lastPongAt = :ts',
-          ExpressionAttributeValues: { ':ts': { N: String(now) } },
-        })
-      );
-      console.log('[PONG_RECEIVED]', {
-        connectionId,
-        timestamp: rawBody.timestamp || 'not provided',
-        lastPongAt: now,
-      });
-    } catch (err) {
-      console.warn('[PONG_UPDATE_ERROR]', { connectionId, error: err instanceof Error ? err.message : String(err) });
-    }
-    return successResponse({ type: 'pong-acknowledged' });
-  }
-
-  // Handle signalling.capabilities (Ctrlr interface spec) - return supported versions
-  if (type === 'signalling.capabilities') {
-    try {
-      await postFormatted(connectionId, {
-        type: 'signalling.capabilities',
-        supportedVersions: SUPPORTED_PROTOCOL_VERSIONS,
-      });
-      return successResponse({ type: 'signalling.capabilities-sent' });
-    } catch (e) {
-      console.warn('[CAPABILITIES_RESPONSE_ERROR]', { connectionId, error: e instanceof Error ? e.message : String(e) });
-      return errorResponse(500, 'Failed to send capabilities');
-    }
-  }
-
-  // Handle ping / signalling.ping - respond with signalling.pong
-  if (type === 'ping' || type === 'signalling.ping') {
-    const rawBody = event.body ? JSON.parse(event.body) : {};
-    const pingId = rawBody.id ?? rawBody.timestamp ?? String(Date.now());
-    try {
-      await postTo(connectionId, {
-        type: 'signalling.pong',
-        version: '0.0',
-        id: `${pingId}-pong`,
-        correlationId: pingId,
-        timestamp: new Date().toISOString(),
-      });
-      console.log('[PING_RESPONDED]', {
-        connectionId,
-        pingId,
-      });
-    } catch (err) {
-      console.warn('[PING_RESPONSE_ERROR]', {
-        connectionId,
-        error: err instanceof Error ? err.message : String(err),
-      });
-    }
-    return successResponse({ type: 'ping-acknowledged' });
+  const routeHandler = MESSAGE_ROUTES.get(type);
+  if (routeHandler) {
+    return routeHandler(claims, event, msg, raw);
   }
 
   // Log unknown message types for debugging
@@ -3,6 +3,11 @@ import { defineFunction, secret } from "@aws-amplify/backend";
 export const signaling = defineFunction({
   runtime: 22,
   resourceGroupName: "data", // Assign to data stack to avoid circular dependency with user pool
+  // JSON logs with level filtering: per-message console.debug traces are dropped unless the level is lowered to debug
+  logging: {
+    format: "json",
+    level: "info",
+  },
   environment: {
     TURN_TOKEN_ID: secret('TURN_TOKEN_ID'),
     TURN_API_TOKEN: secret('TURN_API_TOKEN'),
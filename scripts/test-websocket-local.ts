@@ -284,6 +284,8 @@ async function runTests() {
     console.log('\n✅ Test completed!');
     console.log('\n💡 For detailed routing info, check CloudWatch logs for [PACKET_FORWARD] entries');
     console.log('   These show: source → target connection IDs, message types, and robot IDs');
+    console.log('   They are debug-level: set logging.level to "debug" in amplify/functions/signaling/resource.ts first');
+    console.log('   At the default "info" level, look for [PACKET_FORWARD_REROUTED] and [PACKET_FORWARD_GONE] instead');
 
   } catch (error) {
     console.error('\n❌ Test failed:', error);